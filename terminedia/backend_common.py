@@ -1,15 +1,22 @@
 import re
 import time
 import sys
+from bisect import insort
 from functools import lru_cache
 from io import StringIO
 
 from terminedia.unicode import char_width
 from terminedia.unicode_transforms import translate_chars
-from terminedia.utils import V2, Color
+from terminedia.utils import Color
 from terminedia.values import DEFAULT_BG, DEFAULT_FG, Effects, UNICODE_EFFECTS, ESC
 
 
+@lru_cache(maxsize=4096)
+def _cached_unicode_effects(txt, effects):
+    """Memoized "translate_chars" - the same short strings are rendered over and over"""
+    return translate_chars(txt, effects)
+
+
 class BackendColorContextMixin:
 
     def reset_colors(self, file=None):
@@ -44,18 +51,12 @@ class BackendColorContextMixin:
         use of the terminal, and make no sense when rendering to HTML, but is kept
         for signature compatibility
         """
-        # effect_map = effect_off_map if turn_off else effect_on_map
-        active_unicode_effects = Effects.none
-        for effect in effects:
-            if effect in UNICODE_EFFECTS:
-                active_unicode_effects |= effect
-
-        self.active_unicode_effects = active_unicode_effects
+        self.active_unicode_effects = Effects(int(effects) & int(UNICODE_EFFECTS))
         self.next_effects = effects
 
 
     def apply_unicode_effects(self, txt):
-        return translate_chars(txt, self.active_unicode_effects)
+        return _cached_unicode_effects(txt, self.active_unicode_effects)
 
 
 
@@ -98,6 +99,7 @@ class JournalingCommandsMixin(BackendColorContextMixin):
         self.current_background = DEFAULT_BG
         self.current_effect = Effects.none
         self.current_pos = 0, 0
+        self._journal_attrs = (DEFAULT_FG, DEFAULT_BG, Effects.none)
         super().__init__(**kwargs)
 
     def __enter__(self):
@@ -111,8 +113,11 @@ class JournalingCommandsMixin(BackendColorContextMixin):
         when the outer context is ended.
         """
         if self.in_block == 0:
+            # Journal keys are positions packed as "(y << 16) + x" integers,
+            # which are fast to hash and sort in replay (row-major) order.
             self.journal = {}
-        self.tick = 0
+            # journal keys, kept in the order they are replayed
+            self.journal_order = []
         self.in_block += 1
 
     def _set(self, pos, char):
@@ -123,20 +128,45 @@ class JournalingCommandsMixin(BackendColorContextMixin):
           - char (strig of lenght 1): character to set
 
         Inside a managed context this is called to anotate the current color and position
-        data to the internal Journal.
+        data to the internal Journal. Only the last writting to each position
+        is kept, as it is the only one that will be rendered.
         """
         if not self.in_block:
             raise RuntimeError("Journal not open")
-        self.journal.setdefault(pos, []).append(
-            (
-                self.tick,
-                char,
-                self.current_color,
-                self.current_background,
-                self.current_effect,
-            )
-        )
-        self.tick += 1
+        key = (int(pos[1]) << 16) + int(pos[0])
+        if key not in self.journal:
+            self._add_to_journal_order(key)
+        self.journal[key] = (char, self._get_journal_attrs())
+
+    def _add_to_journal_order(self, key):
+        """Internal function
+
+        Records a new journal key in "journal_order", keeping it sorted
+        so that "replay" does not have to sort the whole journal.
+        As drawing usually takes place left to right and top-down,
+        most insertions are just appends.
+        """
+        order = self.journal_order
+        if not order or key > order[-1]:
+            order.append(key)
+        else:
+            insort(order, key)
+
+    def _get_journal_attrs(self):
+        """Internal function
+
+        Returns a (color, background, effect) tuple for the current attributes.
+        The same tuple object is reused while these do not change, so that
+        all journal entries written with the same attributes share it.
+        """
+        attrs = self._journal_attrs
+        if (
+            attrs[0] is not self.current_color
+            or attrs[1] is not self.current_background
+            or attrs[2] is not self.current_effect
+        ):
+            attrs = self._journal_attrs = (self.current_color, self.current_background, self.current_effect)
+        return attrs
 
     def __exit__(self, exc_name, traceback, frame):
         """Exists a managed context.
@@ -175,6 +205,9 @@ class JournalingCommandsMixin(BackendColorContextMixin):
         are recorded so far. The journal is not touched and
         can be further used inside the same context.
 
+        When replaying to the terminal, characters identical to the ones
+        displayed by the previous replay at the same position are skipped.
+
         If optional `file` is passed, all contents are written  in as a
         text sequence in an optmized top-left to bottom-right stream with the appropriate backend commands
         to position each character (and set colors, etc...).
@@ -184,53 +217,107 @@ class JournalingCommandsMixin(BackendColorContextMixin):
         """
         last_color = last_bg = None
         last_effect = Effects.none
-        last_pos = None
-        # buffer = ""
+        last_attrs = None
+        # Journal key for the position where the cursor is known to be:
+        cursor_key = None
         original_file = file
-        file = StringIO() if not original_file else original_file
 
         if single_write:
+            # Everything is collected in a buffer, and sent
+            # to the output with a single write at the end
+            file = StringIO()
             writer = file.write
         else:
+            file = StringIO() if not original_file else original_file
             writer = lambda char: self._print(char, file=file)
 
-        for pos in sorted(self.journal, key=lambda pos: (pos[1], pos[0])):
-            tick, char, color, bg, effect = self.journal[pos][-1]
-            call = []
-
-            if pos != last_pos:
-                last_pos = pos
-                call.append((self.moveto, pos))
-
-            if color != last_color:
-                last_color = color
-                call.append((self.set_fg_color, color))
-
-            if bg != last_bg:
-                last_bg = bg
-                call.append((self.set_bg_color, bg))
-
-            if effect != last_effect:
-                last_effect = effect
-                call.append((self.set_effects, effect))
-
-            if call:
-                for func, arg in call:
-                    func(arg, file=file)
-
-            writer(char)
-
-            last_pos += 1, 0
+        moveto, set_fg_color, set_bg_color, set_effects = self.moveto, self.set_fg_color, self.set_bg_color, self.set_effects
+
+        # Consecutive characters sharing the same attributes are
+        # collected in a run, which is output with a single
+        # call to "writer" once a change is needed.
+        run = []
+        journal = self.journal
+        # Backends that know what is displayed on their output (the terminal)
+        # keep it in a "shadow" dict, so that unchanged characters can be skipped.
+        shadow = getattr(self, "shadow", None) if single_write and not original_file else None
+        # Key of a cell whose displayed contents are uncertain
+        untracked_key = None
+        for key in self.journal_order:
+            entry = journal[key]
+            char, attrs = entry
+            if shadow is not None:
+                if key == untracked_key:
+                    shadow.pop(key, None)
+                elif shadow.get(key) == entry:
+                    continue
+                if not char.isascii() and char_width(char) != 1:
+                    # Double width, combining or zero width characters change the
+                    # neighbouring cells (or where they are printed): none of these
+                    # are tracked, so they are output again on the next replay.
+                    # (the next cell may not even be in this journal)
+                    shadow.pop(key, None)
+                    shadow.pop(key - 1, None)
+                    shadow.pop(key + 1, None)
+                    untracked_key = key + 1
+                elif key != untracked_key:
+                    shadow[key] = entry
+
+            if key == cursor_key and attrs == last_attrs:
+                run.append(char)
+                cursor_key += 1
+                continue
+
+            if run:
+                cursor_key = self._write_run(writer, run, cursor_key)
+                run = []
+
+            if key != cursor_key:
+                moveto((key & 0xFFFF, key >> 16), file=file)
+
+            if attrs != last_attrs:
+                last_attrs = attrs
+                color, bg, effect = attrs
+
+                if color != last_color:
+                    last_color = color
+                    set_fg_color(color, file=file)
+
+                if bg != last_bg:
+                    last_bg = bg
+                    set_bg_color(bg, file=file)
+
+                if effect != last_effect:
+                    last_effect = effect
+                    set_effects(effect, file=file)
+
+            run.append(char)
+            cursor_key = key + 1
             # TODO: decide what to do with larger than 1 block characters.
             # Advance "last_pos"? Pad with an empty space?
             # the code bellow resulted in a bug when rendering otherwise well behaved "shade" blocks that
             # are listed as havin an unconventional width:
             # width = (char_width(char), 0)
             # last_pos += width, 0
-            self.__class__.last_pos = last_pos
 
-        if not original_file and single_write:
-            self._print(file.getvalue())
+        if run:
+            self._write_run(writer, run, cursor_key)
+
+        if single_write:
+            if shadow is not None:
+                # This output is what the shadow records: it must not clear it.
+                self._print(file.getvalue(), file=original_file, keep_shadow=True)
+            else:
+                self._print(file.getvalue(), file=original_file)
+
+    def _write_run(self, writer, run, cursor_key):
+        """Outputs a run of characters collected by "replay"
+
+        Returns the journal key for the cursor position after the run -
+        backends that keep track of the cursor position should override this.
+        """
+        writer("".join(run))
+        return cursor_key
 
     def print_at(self, pos, txt, file=None):
         """Positions the cursor and prints a text sequence
@@ -250,8 +337,14 @@ class JournalingCommandsMixin(BackendColorContextMixin):
         if txt[0] != ESC and self.active_unicode_effects:
             txt = self.apply_unicode_effects(txt)
 
-        for x, char in enumerate(txt, pos[0]):
-            self._set(V2(x, pos[1]), char)
+        # Inlined version of "._set" - this is the per-character path
+        # while journaling.
+        journal = self.journal
+        attrs = self._get_journal_attrs()
+        for key, char in enumerate(txt, (int(pos[1]) << 16) + int(pos[0])):
+            if key not in journal:
+                self._add_to_journal_order(key)
+            journal[key] = (char, attrs)
 
     def set_fg_color(self, color, file=None):
         """Writes ANSI sequence to set the foreground color
@@ -45,7 +45,7 @@ class HTMLCommands(BackendColorContextMixin):
 
     def __init__(self):
         self.active_unicode_effects = Effects.none
-        self.__class__.last_pos = V2(0, 0)
+        self.last_pos = V2(0, 0)
         self.next_pos = V2(0, 0)
 
         self.current_foreground = None
@@ -65,6 +65,12 @@ class HTMLCommands(BackendColorContextMixin):
             or self.current_effects != self.next_effects
         )
 
+    def invalidate_shadow(self):
+        """No-op: all journaled characters are always output to HTML.
+
+        Kept for signature compatibility with the terminal backend.
+        """
+
     def update_state(self):
         self.current_foreground = self.next_foreground
         self.current_background = self.next_background
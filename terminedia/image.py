@@ -688,7 +688,7 @@ class Shape(ABC, ShapeApiMixin, ShapeDirtyMixin):
         sc = Screen(size=V2(self.width, self.height), backend=backend, interactive=False)
         if backend=="ANSI":
             # generate a relocatable image
-            sc.commands.__class__.last_pos = V2(0, 0)
+            sc.commands.last_pos = (0, 0)
             sc.commands.absolute_movement = False
             sc.commands.force_newlines = True
         # Starts recording all image operations on the internal journal
@@ -226,6 +226,7 @@ class Screen:
             return
 
         self.data.resize(event.size)
+        self.commands.invalidate_shadow()
         # That is it. Other parts of the app that should be aware of screen resizing,
         # should subscribe to the TerminalSizeChange event
 
@@ -436,7 +437,7 @@ class Screen:
 
             if self.root_context.interactive_mode and time.time() - self._last_setitem > 0.1:
                 update_colors = True
-                self.commands.__class__.last_pos = None
+                self.commands.last_pos = None
                 self._last_setitem = time.time()
 
             if update_colors:
@@ -504,8 +505,7 @@ class Screen:
                         self[x, y] = _REPLAY
         if self.root_context.interactive_mode:
             # move cursor a couple lines from the bottom to avoid scrolling
-            for i in range(3):
-                self.commands.up()
+            self.commands.up(3)
 
     def __del__(self):
         if not self.interactive:
@@ -1,4 +1,4 @@
-import re
+import select
 import time
 import sys
 import os
@@ -7,15 +7,12 @@ from functools import lru_cache
 from io import StringIO
 from threading import Lock
 
-from terminedia.backend_common import BackendColorContextMixin, JournalingCommandsMixin
+from terminedia.backend_common import BackendColorContextMixin, JournalingCommandsMixin, _cached_unicode_effects
 from terminedia.contexts import active_context
 from terminedia.unicode import char_width
-from terminedia.unicode_transforms import translate_chars
-from terminedia.utils import V2, Color, Rect
+from terminedia.utils import Color, Rect
 from terminedia.values import DEFAULT_BG, DEFAULT_FG, Effects, unicode_effects_set, ESC, UNICODE_EFFECTS, TERMINAL_EFFECTS, CONTINUATION, EMPTY, TRANSPARENT
 
-use_re_split = sys.version_info >= (3, 7)
-
 E = Effects
 
 #: Inner mappings with actual ANSI codes to turn on and off text effects.
@@ -70,47 +67,133 @@ effect_double_off = {
 }
 
 
-unicode_effect_cache = {}
+#: Effects data used by ``set_effects``, as plain ints so that
+#: no Enum machinery is used when setting effects:
+#: maps each terminal effect bit to (on code, off code, bits of effects sharing the off code)
+_terminal_effect_codes = {
+    int(effect): (
+        effect_on_map[effect],
+        effect_off_map[effect],
+        sum(int(other) for other in effect_double_off.get(effect, ())),
+    )
+    for effect in Effects
+    if effect is not Effects.none and effect not in unicode_effects_set
+}
+_terminal_effect_table = list(_terminal_effect_codes.items())
+_unicode_effect_bits = int(UNICODE_EFFECTS)
+
 
+@lru_cache(maxsize=1024)
+def _effect_codes(effect_bits, reset, turn_off):
+    """SGR parameters for ``ScreenCommands.set_effects``, as a string like "1;23;24..."
 
+    Cached: just a handful of effect combinations are used in any application.
+    """
+    codes = []
+    if reset:
+        for bit, (on_code, off_code, shared_off_bits) in _terminal_effect_table:
+            if effect_bits & bit:
+                codes.append(off_code if turn_off else on_code)
+            elif not effect_bits & shared_off_bits:
+                codes.append(off_code)
+    else:
+        # Visit only the bits that are set, lowest first:
+        remaining = effect_bits & ~_unicode_effect_bits
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            on_code, off_code, _ = _terminal_effect_codes[bit]
+            codes.append(off_code if turn_off else on_code)
+    return ";".join(map(str, codes))
+
+
+@lru_cache(maxsize=1024)
+def _effect_change_codes(previous_bits, effect_bits):
+    """SGR parameters to go from the terminal effects in previous_bits to those in effect_bits
+
+    Effects no longer active are turned off, and then all effects in
+    effect_bits are turned on. Used by ``fast_render``.
+    """
+    codes = []
+    for bits, code_index in ((previous_bits & ~effect_bits, 1), (effect_bits, 0)):
+        while bits:
+            bit = bits & -bits
+            bits ^= bit
+            codes.append(_terminal_effect_codes[bit][code_index])
+    return ";".join(map(str, codes))
 
-if sys.platform != "win32":
-    import fcntl
-    class UnblockTTY:
-        """When changing the terminal to raw mode, stdin and stdout it become "unblocking"
-        meaning that a large amount of output might raise an IO Error
-        (BlockingIOError) when refreshing the output.
 
-        Any code using realtime keyboard reading (using "with terminedia.keyboard:", or
-        the main_loop) make this change to raw mode. (code for that is on the terminedia.input file)
+def _is_single_width(text):
+    """True if each character in text is known to take exactly one terminal cell"""
+    return text.isprintable() and (text.isascii() or all(char_width(char) == 1 for char in text))
 
-        This allows screen refreshing code to temporarily disable
-        the non-blocking nature of the files to avoid this error
-        """
 
-        def __enter__(self):
-            try:
-                self.fd = sys.stdin.fileno()
-            except IOError:
-                self.fake_stdin = True
-                return self
-            self.fake_stdin = False
-            # save old state
-            self.flags_save = fcntl.fcntl(self.fd, fcntl.F_GETFL)
-            #self.attrs_save = termios.tcgetattr(self.fd)
-            flags = self.flags_save & ~os.O_NONBLOCK
-            fcntl.fcntl(self.fd, fcntl.F_SETFL, flags)
-
-        def __exit__(self, *args):
-            #termios.tcsetattr(self.fd, termios.TCSAFLUSH, self.attrs_save)
-            if not self.fake_stdin:
-                fcntl.fcntl(self.fd, fcntl.F_SETFL, self.flags_save)
-else:
-    class UnblockTTY:
-        def __enter__(self):
-            pass
-        def __exit__(self, *args):
-            pass
+def _color_components(color):
+    """Returns the (R, G, B) 0-255 int components for a color
+
+    Color instances already hold normalized components:
+    only other values are converted.
+    """
+    if not isinstance(color, Color):
+        color = Color(color)
+    return color.components
+
+
+@lru_cache(maxsize=4096)
+def _color_parameters(code, components):
+    """SGR parameters to set a 24bit color, like "38;2;255;0;0"
+
+    Cached, as the same few colors are set over and over.
+    """
+    return "{};2;{};{};{}".format(code, *components)
+
+
+@lru_cache(maxsize=4096)
+def _cursor_position(x, y):
+    """CUP sequence moving the cursor to the 0-based (x, y) screen position"""
+    return f"\x1b[{y + 1};{x + 1}H"
+
+
+def _stdout_fd(file):
+    """Returns the file descriptor for ``file`` if it is the process' stdout, else None"""
+    if file is not sys.stdout:
+        return None
+    try:
+        return file.fileno()
+    except (AttributeError, ValueError, OSError):
+        # io.UnsupportedOperation - stdout replaced by an in-memory stream.
+        return None
+
+
+def _write_all(fd, data):
+    """Writes all bytes in ``data`` to the ``fd`` file descriptor.
+
+    When the terminal is in raw mode (while reading the keyboard), stdout
+    is non-blocking: a large output may be partially written, or
+    fail with BlockingIOError. The Python buffered/text wrappers do not
+    report how much was written in these cases, so we do the
+    writes at the OS level, waiting for the descriptor
+    to be ready and resuming from where the last write stopped.
+    """
+    data = memoryview(data)
+    while data:
+        try:
+            written = os.write(fd, data)
+        except BlockingIOError:
+            select.select([], [fd], [])
+            continue
+        data = data[written:]
+
+
+def _flush(file):
+    """Flushes ``file``, waiting with an exponential backoff while it would block"""
+    for attempt in range(11):
+        try:
+            file.flush()
+            return
+        except BlockingIOError:
+            time.sleep(0.002 * (1 << attempt))
+    raise BlockingIOError("Output file is clogged: could not flush data")
 
 
 class ScreenCommands(BackendColorContextMixin):
@@ -126,10 +209,20 @@ class ScreenCommands(BackendColorContextMixin):
     locks = {}
     last_pos = None
 
+    #: Instance that last wrote to the terminal. The cursor position
+    #: tracked by any other instance is no longer valid after it writes.
+    _terminal_writer = None
+
+    #: Journal entries last replayed to the terminal, by journal key
+    #: (see "JournalingCommandsMixin.replay"). Unlike "last_pos", this is
+    #: shared by all instances, as there is a single terminal: any other
+    #: output to it through "._print" clears it.
+    shadow = {}
+
     def __init__(self, absolute_movement=True, force_newlines=False):
         self.alternate_terminal_buffer = 0
         self.active_unicode_effects = Effects.none
-        self.__class__.last_pos = None
+        self.last_pos = None
         self.absolute_movement = absolute_movement
         self.force_newlines = force_newlines
 
@@ -138,12 +231,23 @@ class ScreenCommands(BackendColorContextMixin):
             [
                 "ScreenCommands [\n",
                 f"active_unicode_effects = {self.active_unicode_effects}\n",
-                f"last_pos = {self.__class__.last_pos}\n",
+                f"last_pos = {self.last_pos}\n",
                 "]",
             ]
         )
 
-    def _print(self, *args, sep="", end="", flush=True, file=None):
+    def invalidate_shadow(self):
+        """Forgets which characters are known to be displayed on the terminal.
+
+        The next replay will then output all journaled characters, even the ones
+        that did not change since the previous one. This is done automatically
+        for all output made by terminedia, but should be called if the terminal
+        contents change by other means (e.g. on resizing, or after
+        writting to "sys.stdout" directly).
+        """
+        self.shadow.clear()
+
+    def _print(self, *args, sep="", end="", flush=True, file=None, keep_shadow=False):
         """Inner print method
 
         Args:
@@ -151,39 +255,51 @@ class ScreenCommands(BackendColorContextMixin):
           - sep: Separator to join \\*args
           - end: Sequence to print at end
           - flush: Whether to flush stdin file at end, defaults to ``True``
-          - count: Retry counter - used to calculate delays on retries, or raise
-            on max-retries exceeded (currently hardcoded to 10 atempts)
+          - file: Output file. Defaults to ``sys.stdout``
+          - keep_shadow: Internal use. Whether this output keeps the
+            terminal contents known to the journal replay (see ``shadow``).
 
         Is used in place of normal Python's print, changing the defaults
         to values more suitable to the internal usage.
 
+        Output to the process' stdout is encoded once and sent
+        straight to its file descriptor - see ``_write_all``.
         """
         if file is None:
             file = sys.stdout
+        if file is sys.stdout:
+            # All terminal output, including that of "cls" and "terminedia.print",
+            # goes through here.
+            if not keep_shadow:
+                # Displayed contents may have changed
+                self.shadow.clear()
+            writer = ScreenCommands._terminal_writer
+            if writer is not self:
+                if writer is not None:
+                    # The cursor is no longer where that instance left it
+                    writer.last_pos = None
+                ScreenCommands._terminal_writer = self
+        text = args[0] if len(args) == 1 else sep.join(args)
+        if end:
+            text += end
+        if file.__class__ is StringIO:
+            # In-memory buffer, as used by "replay": there is nothing to flush.
+            file.write(text)
+            return
         if sys.platform == "win32":
-            print(sep.join(args), end=end, flush=flush, file=file)
+            print(text, end="", flush=flush, file=file)
             return
 
-        with UnblockTTY():
-            if len(args) != 1:
-                file.write(sep.join(args))
-            else:
-                file.write(args[0])
-            file.write(end)
-            if flush:
-                file.flush()
-        return
-
-
-        # Historic curiosity: there was a previous code with retry attempts.
-        # and breaking the data into chunks.
-        # most of this code was written to avoid
-        # an "blocking error" when outputing too much data
-        # to a posix terminal converted to raw mode.
-        # The temporary change of the terminal back to blocking
-        # should have fixed it.
-        # TL;DR: cludge removed
+        fd = _stdout_fd(file)
+        if fd is not None:
+            # Anything still in the text-layer buffer must go out first
+            _flush(file)
+            _write_all(fd, text.encode(file.encoding or "utf-8", file.errors or "strict"))
+            return
 
+        file.write(text)
+        if flush:
+            _flush(file)
 
     def fast_render(self, data, rects=None, file=None):
         key = getattr(file, "name", "<stdout>")
@@ -200,13 +316,16 @@ class ScreenCommands(BackendColorContextMixin):
         CSI = "\x1b["
         SGR = "m"
         MOVE = "H"
-        last_pos = self.__class__.last_pos
+        last_pos = self.last_pos
         last_fg = last_bg = last_tm_effects = last_un_effects = None
         seen = set()
+        # Output parts are collected in a list, and sent with a single write
+        # for all rects. ("str +=" is only cheap on CPython)
+        output = []
+        write = output.append
         for rect in sorted(rects):
             if not isinstance(rect, Rect):
                 rect = Rect(rect)
-            outstr = ""
             for y in range(rect.top, rect.bottom):
                 for x in range(rect.left, rect.right):
                     if (x, y) in seen: continue
@@ -222,85 +341,74 @@ class ScreenCommands(BackendColorContextMixin):
                     csi = False
 
                     if fg != last_fg and fg != TRANSPARENT:
-                        outstr += CSI
+                        write(CSI)
                         csi = True
-                        if fg == DEFAULT_FG:
-                            outstr += "39"
+                        if fg is DEFAULT_FG:
+                            write("39")
                         else:
-                            outstr += "38;2;{};{};{}".format(*fg)
+                            write(_color_parameters(38, _color_components(fg)))
 
                     if bg != last_bg and bg != TRANSPARENT:
                         if not csi:
-                            outstr += CSI
+                            write(CSI)
                             csi = True
                         else:
-                            outstr += ";"
-                        if bg == DEFAULT_BG:
-                            outstr += "49"
+                            write(";")
+                        if bg is DEFAULT_BG:
+                            write("49")
                         else:
-                            outstr += "48;2;{};{};{}".format(*bg)
+                            write(_color_parameters(48, _color_components(bg)))
 
                     if tm_effects != last_tm_effects and effects != TRANSPARENT:
-                        semic = ";"
+                        codes = _effect_change_codes(int(last_tm_effects or 0), int(tm_effects))
                         if not csi:
-                            outstr += CSI
-                            semic = ""
+                            write(CSI)
                             csi = True
-
-                        if last_tm_effects:
-                            for effect in last_tm_effects:
-                                if effect not in tm_effects:
-                                    outstr += f"{semic}{effect_off_map[effect]}"
-                                    semic = ";"
-                        for effect in tm_effects:
-                            outstr += f"{semic}{effect_on_map[effect]}"
-                            semic = ";"
+                            write(codes)
+                        elif codes:
+                            write(";")
+                            write(codes)
 
                     if csi:
-                        outstr += "m"
+                        write("m")
                         last_fg = fg; last_bg = bg; last_tm_effects = tm_effects
                     if char is CONTINUATION:
                         # ensure two spaces for terminedia double-width chars -
                         # can possibly be made more efficient if run in a terminal
                         # that treat those correctly (not the case in current era konsole)
-                        outstr += EMPTY
+                        write(EMPTY)
+                        last_pos = None
                     if char not in (TRANSPARENT, CONTINUATION):
                         if (x, y) != last_pos:
-                            # TODO: relative movement?
-                            outstr += CSI + f"{y + 1};{x + 1}H"
+                            if last_pos and last_pos[1] == y and x > last_pos[0]:
+                                # skipping cells forward in the same row: CUF is shorter
+                                write(f"{CSI}{x - last_pos[0]}C")
+                            else:
+                                write(_cursor_position(x, y))
                         final_char = self.apply_unicode_effects(char, un_effects)
-                        outstr += final_char
-
-                        last_pos = (x + 1, y)
-
-            if file is sys.stdout:
-                # temporarily disable 'non-blocking' for stdout
-                with UnblockTTY():
-                    file.write(outstr)
-                    file.flush()
-            else:
-                file.write(outstr)
-                file.flush()
-
-            self.__class__.last_pos = last_pos
+                        write(final_char)
 
+                        last_pos = (x + 1, y) if _is_single_width(final_char) else None
 
+        if output:
+            self._print("".join(output), file=file)
+        self.last_pos = last_pos
 
-    def CSI(self, *args, file=None):
+    def CSI(self, *args, file=None, keep_shadow=False):
         """Writes a CSI command to the terminal
 
         Args:
           - \\*args: Sequence of parameters to the command, including the last
               one that should be a letter specifying the command
+          - keep_shadow: Whether the command leaves the displayed characters
+              unchanged (see ``_print``)
 
         Just a fancy way to print the ANSI "CSI" (Control Sequence Introducer") commands
         These are commads stated with the "<ESC>[" sequence.
 
         Check https://en.wikipedia.org/wiki/ANSI_escape_code#CSI_sequences for available commands
         """
-        command = args[-1]
-        args = ";".join(str(arg) for arg in args[:-1]) if args else ""
-        self._print("\x1b[", args, command, file=file)
+        self._print(f"\x1b[{';'.join(map(str, args[:-1]))}{args[-1]}", file=file, keep_shadow=keep_shadow)
 
     def SGR(self, *args, file=None):
         """Writes a SGR command (Select Graphic Rendition)
@@ -328,37 +436,37 @@ class ScreenCommands(BackendColorContextMixin):
     def toggle_buffer(self, file=None):
         self.CSI("?1049", "l" if self.alternate_terminal_buffer else "h", file=file)
         self.alternate_terminal_buffer = not self.alternate_terminal_buffer
+        self.last_pos = None
 
+    # Cursor movements do not change what is displayed: the shadow is kept
     def up(self, amount=1, file=None):
         """Writes ANSI Sequence to move cursor up"""
-        self.CSI(amount, "A", file=file)
+        self.CSI(amount, "A", file=file, keep_shadow=True)
+        self.last_pos = None
 
     def down(self, amount=1, file=None):
         """Writes ANSI Sequence to move cursor down"""
-        self.CSI(amount, "B", file=file)
+        self.CSI(amount, "B", file=file, keep_shadow=True)
+        self.last_pos = None
 
     def right(self, amount=1, file=None):
         """Writes ANSI Sequence to move cursor right"""
-        self.CSI(amount, "C", file=file)
+        self.CSI(amount, "C", file=file, keep_shadow=True)
+        self.last_pos = None
 
     def left(self, amount=1, file=None):
         """Writes ANSI Sequence to move cursor left"""
-        self.CSI(amount, "D", file=file)
+        self.CSI(amount, "D", file=file, keep_shadow=True)
+        self.last_pos = None
 
     def apply_unicode_effects(self, txt, effects=None):
         effects = effects if effects is not None else self.active_unicode_effects
-
-        if (effects, txt) in unicode_effect_cache:
-            return unicode_effect_cache[effects, txt]
-
-        result = translate_chars(txt, effects)
-        unicode_effect_cache[effects, txt] = result
-        return result
+        return _cached_unicode_effects(txt, effects)
 
     def home(self, file=None):
 
         self.CSI(f"0;0H", file=file)
-        self.__class__.last_pos = V2(0,0)
+        self.last_pos = (0, 0)
 
 
     def moveto(self, pos, file=None):
@@ -371,25 +479,40 @@ class ScreenCommands(BackendColorContextMixin):
         while in this project, coordinates start at 0 to conform
         to graphic display expected behaviors
         """
-        pos = V2(pos)
-        if pos != (0, 0) and pos == self.__class__.last_pos:
+        # plain tuples rather than V2: this runs once per drawing primitive
+        last_pos = self.last_pos
+        pos = x, y = int(pos[0]), int(pos[1])
+        if pos == last_pos and pos != (0, 0):
             return
         if self.absolute_movement:
-            self.CSI(f"{pos.y + 1};{pos.x + 1}H", file=file)
+            # Moves along the same row or column from a known position
+            # use the shorter relative sequences (CUF, CUD, CUU).
+            # Moving backwards is avoided: the tracked position may be
+            # past the right margin after printing on the last column.
+            delta_x = x - last_pos[0] if last_pos else -1
+            delta_y = y - last_pos[1] if last_pos else -1
+            if delta_y == 0 and delta_x > 0:
+                self.right(delta_x, file=file)
+            elif delta_x == 0 and delta_y > 0:
+                self.down(delta_y, file=file)
+            elif delta_x == 0 and delta_y < 0:
+                self.up(-delta_y, file=file)
+            else:
+                self._print(_cursor_position(x, y), file=file)
         else:
-            if self.__class__.last_pos and pos.y == self.__class__.last_pos.y + 1:
+            if last_pos and y == last_pos[1] + 1:
                 self._print("\n", file=file)
-                if pos.x != 0:
-                    self.right(pos.x, file=file)
+                if x != 0:
+                    self.right(x, file=file)
             else:
-                if not self.__class__.last_pos:
-                    self.__class__.last_pos = V2(0,0)
-                delta_x = pos.x - self.__class__.last_pos.x
-                delta_y = pos.y - self.__class__.last_pos.y
+                if not last_pos:
+                    last_pos = (0, 0)
+                delta_x = x - last_pos[0]
+                delta_y = y - last_pos[1]
                 if delta_y > 0:
                     if self.force_newlines:
                         self._print("\n" * delta_y, file=file)
-                        delta_x = pos.x
+                        delta_x = x
                     else:
                         self.down(delta_y, file=file)
                 elif delta_y < 0:
@@ -400,8 +523,7 @@ class ScreenCommands(BackendColorContextMixin):
                 elif delta_x < 0:
                     self.left(-delta_x, file=file)
 
-
-        self.__class__.last_pos = pos
+        self.last_pos = pos
 
 
     def save_cursor_position(self, file=None):
@@ -413,6 +535,7 @@ class ScreenCommands(BackendColorContextMixin):
     def restore_cursor_position(self, file=None):
         """Restores saved cursor position (in the TTY software)"""
         self.CSI("u", file=file)
+        self.last_pos = None
 
     RCP = restore_cursor_position
 
@@ -457,19 +580,21 @@ class ScreenCommands(BackendColorContextMixin):
             texts = [self.apply_unicode_effects(text) if text[0] != ESC else text for text in texts]
 
         if pos:
-            self.__class__.last_pos = None
+            self.last_pos = None
             self.moveto(pos, file=file)
 
+        # All text is collected and written at once, with a single flush
+        output = []
         first_text = True
         for text in texts:
             if not first_text:
-                self._print(sep, file=file, end="")
+                output.append(sep)
             if not isinstance(text, str):
                 text = str(text)
             tokenized = MLTokenizer(text)
             tokenized.parse()
             if not tokenized.mark_sequence:
-                self._print(text, file=file, flush=flush, sep=sep, end=end)
+                output.append(text + end)
             else:
                 try:
                     size = os.get_terminal_size()
@@ -477,12 +602,13 @@ class ScreenCommands(BackendColorContextMixin):
                     size = 80, 25
                 sh = shape(size)
                 sh.text[1][0,0] = text
-                output = sh.render()
-                self._print(output, file=file, flush=flush, sep=sep, end="")
+                output.append(sh.render())
             first_text = False
-        self._print(end, file=file, flush=flush, end="")
+        output.append(end)
+        self._print("".join(output), file=file, flush=flush)
 
         self.set_colors(*original_attributes, file=file)
+        self.last_pos = None
 
     def print_at(self, pos, text, file=None):
         """Positions the cursor and prints a text sequence
@@ -493,10 +619,10 @@ class ScreenCommands(BackendColorContextMixin):
 
         There is an optimization that avoids re-issuing
         cursor-positioning ANSI sequences for repeated
-        calls of this function - this uses a class
-        attribute so that different Screen instances won't clash,
-        but might yield concurrency problems if appropriate
-        locks are not in place in concurrent code.
+        calls of this function - the cursor position is tracked
+        in the "last_pos" instance attribute. Writting to the terminal
+        from another instance resets it, but each instance writting
+        to another file should be the only one writting to it.
         """
         if text[0] != ESC and self.active_unicode_effects:
             text = self.apply_unicode_effects(text)
@@ -507,7 +633,13 @@ class ScreenCommands(BackendColorContextMixin):
         # (double width chars are ignored on purpose - as the repositioning
         # skipping one char to the left on the higher level classes will
         # re be reissued instead of skipped)
-        self.__class__.last_pos += (len(text), 0)
+        last_pos = self.last_pos
+        if self.absolute_movement and not _is_single_width(text):
+            # Where the terminal leaves the cursor is uncertain:
+            # force the next movement to be an absolute one.
+            self.last_pos = None
+        else:
+            self.last_pos = (last_pos[0] + len(text), last_pos[1])
 
     def reset_colors(self, file=None):
         """Writes ANSI sequence to reset terminal colors to the default"""
@@ -517,19 +649,19 @@ class ScreenCommands(BackendColorContextMixin):
         """Writes ANSI sequence to set the foreground color
         color: RGB  3-sequence (0.0-1.0 or 0-255 range) or color constant
         """
-        if color == DEFAULT_FG:
+        if color is DEFAULT_FG:
             self.SGR(39, file=file)
         else:
-            self.SGR(38, 2, *Color(color), file=file)
+            self.SGR(_color_parameters(38, _color_components(color)), file=file)
 
     def set_bg_color(self, color, file=None):
         """Writes ANSI sequence to set the background color
         color: RGB  3-sequence (0.0-1.0 or 0-255 range) or color constant
         """
-        if color == DEFAULT_BG:
+        if color is DEFAULT_BG:
             self.SGR(49, file=file)
         else:
-            self.SGR(48, 2, *Color(color), file=file)
+            self.SGR(_color_parameters(48, _color_components(color)), file=file)
 
     def set_effects(
         self,
@@ -564,35 +696,27 @@ class ScreenCommands(BackendColorContextMixin):
         if effects is TRANSPARENT:
             return
 
-        sgr_codes = []
-
-        effect_map = effect_off_map if turn_off else effect_on_map
-        active_unicode_effects = Effects.none
-
-        for effect_enum in Effects:
-            if effect_enum is Effects.none:
-                continue
-            if effect_enum in unicode_effects_set:
-                if effect_enum & effects:
-                    active_unicode_effects |= effect_enum
-                continue
-            if effect_enum & effects:
-                sgr_codes.append(effect_map[effect_enum])
-            elif reset and (
-                not effect_enum in effect_double_off
-                or not any(e & effects for e in effect_double_off[effect_enum])
-            ):
-                sgr_codes.append(effect_off_map[effect_enum])
-
-        self.active_unicode_effects = active_unicode_effects
+        effect_bits = int(effects)
+        self.active_unicode_effects = Effects(effect_bits & _unicode_effect_bits)
         if not update_active_only:
-            self.SGR(*sgr_codes, file=file)
+            self.SGR(_effect_codes(effect_bits, bool(reset), bool(turn_off)), file=file)
 
 
 class JournalingScreenCommands(JournalingCommandsMixin, ScreenCommands):
     """Internal use class to optimize writting ANSI-Sequence commands to the terminal
     """
-    pass
+
+    def _write_run(self, writer, run, cursor_key):
+        """Outputs a run of characters collected by "replay", and updates the tracked cursor position
+
+        Returns the journal key for the cursor position after the run, or None if it is uncertain.
+        """
+        cursor_key = super()._write_run(writer, run, cursor_key)
+        if self.absolute_movement and not _is_single_width("".join(run)):
+            # Terminal cursor position after wide characters is uncertain:
+            cursor_key = None
+        self.last_pos = (cursor_key & 0xFFFF, cursor_key >> 16) if cursor_key is not None else None
+        return cursor_key
 
 
 def cls():
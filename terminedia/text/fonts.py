@@ -1,10 +1,8 @@
-import binascii
-from copy import copy
+from functools import lru_cache
 from pathlib import Path
 
-from terminedia.image import Shape, PalettedShape
-from terminedia.utils import contextkwords, V2, Rect
-from terminedia.values import Directions, EMPTY, TRANSPARENT
+from terminedia.image import PalettedShape
+from terminedia.values import Directions, EMPTY
 
 try:
     # This is the only Py 3.7+ specific thing in the project
@@ -16,7 +14,12 @@ except ImportError:
 font_registry = {}
 
 
+@lru_cache(maxsize=64)
 def _normalize_font_path(font_path):
+    """Returns the font file name for a font name or alias, and whether it is a bundled resource
+
+    Cached, as this is called for each rendered text and checks the filesystem.
+    """
     font_is_resource = font_path == "" or not Path(font_path).exists()
     if font_is_resource:
         if font_path == "16":
@@ -44,67 +47,131 @@ def list_fonts():
         path = Path(__file__).parent.parent / "data"
         files = [str(f) for f in path.iterdir()]
     else:
-        files = list(resources.contents("terminedia.data"))
+        files = (
+            [item.name for item in resources.files("terminedia.data").iterdir()]
+            if hasattr(resources, "files") else list(resources.contents("terminedia.data"))
+        )
     return [f for f in files if f.endswith(".hex")]
 
 
-def load_font(font_path, font_is_resource, page=0, ch1=EMPTY, ch2="#"):
-
-    initial = page << 8
-    last = initial + 0x100
+@lru_cache(maxsize=16)
+def _read_font_file(font_path, font_is_resource):
+    """Returns the lines in a font file, as bytes objects.
 
+    Cached, so that the file is read once, however many glyphs or pages are loaded.
+    """
     if font_is_resource and resources:
-        data = list(resources.open_text("terminedia.data", font_path))
+        if hasattr(resources, "files"):
+            # Python 3.9+
+            data = resources.files("terminedia.data").joinpath(font_path).read_bytes()
+        else:
+            data = resources.read_binary("terminedia.data", font_path)
 
     elif font_is_resource and not resources:
-        path = Path(__file__).parent / "data" / font_path
-        data = list(open(path).readlines())
+        data = (Path(__file__).parent.parent / "data" / font_path).read_bytes()
     else:
         # TODO: enable more font types, and
         # TODO: enable fallback to other fonts if glyphs not present in the requested one
-        data = list(open(font_path).readlines())
+        data = Path(font_path).read_bytes()
+    # Font files are plain ASCII: lines are kept as bytes, with no decoding step
+    return tuple(data.splitlines())
 
-    font = {}
 
-    for i, line in enumerate(data[initial:last], initial):
-        line = line.split(":")[1].strip()
-        line = binascii.unhexlify(line)
-        char = "\n".join(f"{bin(v).split('b')[1]}".zfill(8) for v in line)
-        char = char.replace("0", ch1).replace("1", ch2)
-        font[chr(i)] = char
+@lru_cache()
+def _row_table(ch1, ch2):
+    """Returns a 256-item table with the 8-character glyph row for each byte value"""
+    return [f"{value:08b}".replace("0", ch1).replace("1", ch2) for value in range(256)]
 
-    return font
 
+def _find_glyph_line(lines, codepoint):
+    """Returns the line for "codepoint" in the lines of a font file, or None
 
-GLYPH_CACHE = {}
+    Font files list glyphs sorted by codepoint - most of the lower ones
+    in contiguous lines, so the line at the codepoint index is tried first,
+    and a binary search is used if it does not match.
+    """
+    low, high = 0, min(len(lines), codepoint + 1)
+    middle = high - 1
+    while low < high:
+        line = lines[middle]
+        line_codepoint = int(line[:line.index(b":")], 16)
+        if line_codepoint == codepoint:
+            return line
+        if line_codepoint < codepoint:
+            low = middle + 1
+        else:
+            high = middle
+        middle = (low + high) // 2
+    return None
+
+
+class LazyFont(dict):
+    """Mapping of characters to glyph strings for a font file.
+
+    Glyphs are parsed from the font file lines as they are first used,
+    and kept afterwards.
+    """
 
+    def __init__(self, font_path, font_is_resource, ch1=EMPTY, ch2="#"):
+        super().__init__()
+        self.lines = _read_font_file(font_path, font_is_resource)
+        self.rows = _row_table(ch1, ch2)
+        self.shapes = {}
+
+    def __missing__(self, char):
+        line = _find_glyph_line(self.lines, ord(char))
+        if line is None:
+            raise KeyError(char)
+        rows = self.rows
+        glyph = self[char] = "\n".join([rows[v] for v in bytes.fromhex(line[line.index(b":") + 1:].decode())])
+        return glyph
+
+    def __contains__(self, char):
+        return super().__contains__(char) or _find_glyph_line(self.lines, ord(char)) is not None
+
+    def get(self, char, default=None):
+        try:
+            return self[char]
+        except KeyError:
+            return default
+
+    def shape(self, char, shape_cls=PalettedShape):
+        """Returns the glyph for "char" as a "shape_cls" instance.
+
+        Glyph shapes are built once for each shape class, and shared by
+        all renderings: they should not be modified.
+        """
+        key = (shape_cls, char)
+        shape = self.shapes.get(key)
+        if shape is None:
+            shape = self.shapes[key] = shape_cls(self.get(char, "?"))
+        return shape
 
-def render(text, font=None, shape_cls=PalettedShape, direction=Directions.RIGHT):
-    if font is None:
-        font = ""
-    font_id, is_resource = _normalize_font_path(font)
 
-    font = font_registry.get(font_id, None)
+def load_font(font_path, font_is_resource, page=0, ch1=EMPTY, ch2="#"):
+    """Returns a dictionary with the glyphs for a 256-character page of a font file"""
+
+    font = LazyFont(font_path, font_is_resource, ch1, ch2)
+    initial = page << 8
+    return {char: font[char] for char in map(chr, range(initial, initial + 0x100)) if char in font}
+
 
-    if not font:
-        # Always load page-0 (first 256 chars)
-        font_registry.setdefault(font_id, {}).update(load_font(font_id, is_resource))
-        font = font_registry[font_id]
+def _render_glyph(font_id, is_resource, shape_cls, char):
+    """Returns the shape for a single character in a font (see "LazyFont.shape")"""
+    font = font_registry.get(font_id, None)
+    if font is None:
+        font = font_registry[font_id] = LazyFont(font_id, is_resource)
+    return font.shape(char, shape_cls)
 
-    cache_index = (font_id, shape_cls, text)
-    if len(text) == 1 and cache_index in GLYPH_CACHE:
-        return GLYPH_CACHE[cache_index]
 
-    phrase = []
-    for char in text:
-        if char not in font:
-            font.update(load_font(font_id, is_resource, page=ord(char)//0x100))
-        phrase.append(shape_cls(font.get(char, "?")))
+def render(text, font=None, shape_cls=PalettedShape, direction=Directions.RIGHT):
+    if font is None:
+        font = ""
+    font_id, is_resource = _normalize_font_path(font)
 
-    if len(text) == 0:
+    if len(text) == 1:
+        return _render_glyph(font_id, is_resource, shape_cls, text)
+    elif len(text) == 0:
         return shape_cls.new((0, 0))
-    elif len(text) == 1:
-        GLYPH_CACHE[cache_index] = phrase[0]
-        return phrase[0]
+    phrase = [_render_glyph(font_id, is_resource, shape_cls, char) for char in text]
     return phrase[0].concat(*phrase[1:], direction=direction)
-
@@ -1,23 +1,22 @@
-import binascii
 from collections import namedtuple
 from copy import copy
-from pathlib import Path
+from functools import lru_cache
 import threading
 
-from terminedia.image import Shape, PalettedShape, shape
-from terminedia.unicode import split_graphemes
+from terminedia.image import shape
 from terminedia.utils import contextkwords, V2, Rect, ObservableProperty, get_current_tick
-from terminedia.values import Directions, EMPTY, TRANSPARENT, RETAIN_POS
+from terminedia.values import EMPTY, TRANSPARENT, RETAIN_POS
 from terminedia.values import WIDTH_INDEX, HEIGHT_INDEX
 
 from .fonts import render
 from ..text import style
 
 
-class CharPlaneData(dict):
+class CharPlaneData(list):
     """2D Data structure to hold the text contents of a text plane.
 
-    Indices should be a V2 (or 2 sequence) within width and height ranges
+    Indices should be a V2 (or 2 sequence) within width and height ranges.
+    Contents are kept in a flat, row-major list - one item per text cell.
     """
 
     __slots__ = ("_parent", "width", "height", "size", "active", "_dirty")
@@ -25,35 +24,62 @@ class CharPlaneData(dict):
     def __new__(cls, parent):
         instance = super().__new__(cls)
         instance._parent = parent
+        instance.width = instance.height = 0
+        instance.size = None
         return instance
 
     def __init__(self, size):
         self.active = True
 
     def _update_size(self, *args):
-        size = self.size = self._parent.size
-        self.width = size[0]
-        self.height = size[1]
+        size = self._parent.size
+        if size == self.size:
+            return
+        width, height = size
+        old_width, old_height = self.width, self.height
+        contents = [EMPTY] * (width * height)
+        # Lay out existing text in the new shape, cropping if needed:
+        columns = min(width, old_width)
+        for y in range(min(height, old_height)):
+            contents[y * width: y * width + columns] = super().__getitem__(slice(y * old_width, y * old_width + columns))
+        super().__setitem__(slice(None), contents)
+        self.size = size
+        self.width = width
+        self.height = height
+
+    def _check_bounds(self, x, y):
+        # Size may have changed in the parent plane: update it before failing
+        self._update_size()
+        if (x | y) < 0 or x >= self.width or y >= self.height:
+            raise IndexError(f"Text position out of range - {self.size}")
 
     def __getitem__(self, pos):
-        for retry in 0, 1:
-            if not (0 <= pos[0] < self.width) or not (0 <= pos[1] < self.height):
-                if retry == 0:
-                    self._update_size()
-                    continue
-                raise IndexError(f"Text position out of range - {self.size}")
-        return super().get(pos, EMPTY)
+        x, y = pos
+        # "(x | y) < 0" is True if either coordinate is negative
+        if (x | y) < 0 or x >= self.width or y >= self.height:
+            self._check_bounds(x, y)
+        return super().__getitem__(y * self.width + x)
 
     def __setitem__(self, pos, value):
-        for retry in 0, 1:
-            if not (0 <= pos[0] < self.width) or not (0 <= pos[1] < self.height):
-                if retry == 0:
-                    self._update_size()
-                    continue
-                raise IndexError(f"Text position out of range - {self.size}")
+        x, y = pos
+        if (x | y) < 0 or x >= self.width or y >= self.height:
+            self._check_bounds(x, y)
         if not self.active:
             return
-        super().__setitem__(pos, value)
+        super().__setitem__(y * self.width + x, value)
+
+    def row(self, y, start=0, stop=None):
+        """Returns a list with the contents of row "y", from column "start" up to "stop" (exclusive)"""
+        if stop is None:
+            stop = self.width
+        if (start | y) < 0 or stop > self.width or y >= self.height:
+            self._check_bounds(start, y)
+            self._check_bounds(stop - 1, y)
+        offset = y * self.width
+        return super().__getitem__(slice(offset + start, offset + stop))
+
+    def clear(self):
+        super().__setitem__(slice(None), [EMPTY] * (self.width * self.height))
 
 
 plane_alias = {
@@ -69,6 +95,17 @@ plane_alias = {
 plane_names = {**plane_alias, **{value:value for value in plane_alias.values()}}
 
 
+# Name of the owner's attribute whose ".draw" renders big characters
+# for each text plane ("" stands for the owner itself)
+plane_draw_targets = {
+    2: "braille",
+    3: "sextant",
+    4: "high",
+    (8, 4): "square",
+    8: "",
+}
+
+
 # Shift caused by each 1 unit of padding (always in character-blocks) on
 # the pixel resolution each text size uses:
 pad_factors = {
@@ -124,6 +161,27 @@ class Layouts:
             text_plane.marks.data[x, -1] = mark_backward
 
 
+@lru_cache(maxsize=256)
+def _parse_markup(text):
+    """Returns the (parsed_text, mark_sequence) pair for a marked-up text.
+
+    Programs tend to print the same strings over and over, so parsing is cached.
+    As rendering sets the "context" and "pos" of each mark, the marks
+    returned should not be rendered directly - use "_copy_marks".
+    """
+    tokens = style.MLTokenizer(text)
+    tokens.parse()
+    return tokens.parsed_text, tokens.mark_sequence
+
+
+def _copy_marks(mark_sequence):
+    """Shallow copies the marks in a parsed mark_sequence, so that they can be rendered"""
+    return {
+        index: [copy(mark) for mark in marks] if isinstance(marks, list) else copy(marks)
+        for index, marks in mark_sequence.items()
+    }
+
+
 class _RecordingControl:
     """Simple class to keep track of where each character was printed in an
     output burst.
@@ -182,6 +240,8 @@ class TextPlane:
     """
 
 
+    _index_offset_cache = None
+
     def __init__(self, owner):
         """Not intented to be instanced directly - instantiated as a Shape property.
 
@@ -280,8 +340,10 @@ class TextPlane:
         concretized_text.recording = _RecordingControl(concretized_text)
         for pad_attr in "padding pad_left pad_right pad_top pad_bottom".split():
             descriptor = getattr(type(self), pad_attr)
-            descriptor.register(self, "set", lambda inst, v, attr=pad_attr: setattr(concretized_text, attr, v))
+            # (callbacks are called with the value set, then the instance)
+            descriptor.register(self, "set", lambda value, inst, attr=pad_attr: setattr(concretized_text, attr, value))
             descriptor.register(concretized_text, "set", data._update_size)
+            descriptor.register(concretized_text, "set", concretized_text._reset_index_offset)
         data._update_size()
         # plane["text"] = concretized_text
 
@@ -317,11 +379,14 @@ class TextPlane:
         return self.planes[index]
 
     def __getitem__(self, index):
+        if "current_plane" in self.__dict__:
+            return self.plane[index]
+        # Concrete planes are built once, on first use, and reused afterwards
         index = plane_alias.get(index, index)
-        if "current_plane" not in self.__dict__:
-            self._checkplane(index)
-            return self.planes[index]
-        return self.plane[index]
+        plane = self.planes.get(index)
+        if plane is None:
+            plane = self._checkplane(index)
+        return plane
 
     def __setitem__(self, index, value):
         if isinstance(index[0], slice) or isinstance(index[1], slice):
@@ -420,8 +485,8 @@ class TextPlane:
 
     def _at(self, pos, text):
         with self.lock:
-            tokens = style.MLTokenizer(text)
-            styled = tokens(text_plane=self, starting_point=pos)
+            parsed_text, mark_sequence = _parse_markup(text)
+            styled = style.StyledSequence(parsed_text, _copy_marks(mark_sequence), text_plane=self, starting_point=pos)
             self.render_styled_sequence(styled)
             return self.last_pos
 
@@ -432,13 +497,13 @@ class TextPlane:
             # Think on storing "lost characters" - but where to put them?
             return
         ctx = self.owner.context
-        direction = ctx.direction
         self.blit(pos)
-        if self.recording:
+        if self.recording.active:
             self.recording.register(char, pos, get_current_tick(), CtxData(ctx.foreground, ctx.background, ctx.effects))
 
-        pos += (int(getattr(ctx, "text_lastchar_was_double", 0)) * direction[0], 0)
-        self.owner.context.last_pos = pos
+        if getattr(ctx, "text_lastchar_was_double", False):
+            pos += (ctx.direction[0], 0)
+        ctx.last_pos = pos
         self.last_pos = pos
 
     def clear_recording(self):
@@ -463,44 +528,53 @@ class TextPlane:
         if char is EMPTY and not clear:
             return
 
-        index = V2(index)
-        cur_plane = self.current_plane
-
-        if self.padding or self.pad_top or self.pad_left:
-            pad_top = self.pad_top if self.pad_top is not None else self.padding
-            pad_left = self.pad_left if self.pad_left is not None else self.padding
-            index_offset = (
-                pad_left * pad_factors[self.current_plane][0],
-                pad_top * pad_factors[self.current_plane][1]
-            )
-        else:
-            index_offset = (0, 0)
+        offset_x, offset_y = self._index_offset()
 
         if self.current_plane == 1:
             # self.context.shape_lastchar_was_double is set in this operation.
-            target[index + index_offset] = char
+            target[V2(index) + (offset_x, offset_y)] = char
             target.context.text_lastchar_was_double = target.context.shape_lastchar_was_double
             return
 
         # FIXME: take in account double-width chars when rendering
         # big-text
-        target.context.text_last_char_was_double = False
-        rendered_char = render(
-            self.plane[index], font=target.context.font or self.font
-        )
-        index = (index * 8).as_int + index_offset
-        if self.current_plane == 2:
-            target.braille.draw.blit(index, rendered_char, erase=clear)
-        elif self.current_plane == 3:
-            target.sextant.draw.blit(index, rendered_char, erase=clear)
-        elif self.current_plane == 4:
-            target.high.draw.blit(index, rendered_char, erase=clear)
-        elif self.current_plane == (8, 4):
-            target.square.draw.blit(index, rendered_char, erase=clear)
-        elif self.current_plane == 8:
-            target.draw.blit(index, rendered_char, erase=clear)
-        else:
-            raise ValueError(f"Size {self.current_plane} not implemented for rendering")
+        context = target.context
+        context.text_last_char_was_double = False
+        rendered_char = render(char, font=context.font or self.font)
+        index = (int(index[0]) * 8 + offset_x, int(index[1]) * 8 + offset_y)
+        self._big_text_draw(target).blit(index, rendered_char, erase=clear)
+
+    def _index_offset(self):
+        """Offset, in the target resolution, caused by the text padding
+
+        Cached, as the padding attributes are observable properties,
+        costly to read: the cache is reset whenever any of them is set.
+        """
+        offset = self._index_offset_cache
+        if offset is None:
+            if self.padding or self.pad_top or self.pad_left:
+                pad_top = self.pad_top if self.pad_top is not None else self.padding
+                pad_left = self.pad_left if self.pad_left is not None else self.padding
+                factor_x, factor_y = pad_factors[self.current_plane]
+                offset = (pad_left * factor_x, pad_top * factor_y)
+            else:
+                offset = (0, 0)
+            self._index_offset_cache = offset
+        return offset
+
+    def _reset_index_offset(self, *args):
+        self._index_offset_cache = None
+
+    def _big_text_draw(self, target):
+        """Drawing API on "target" used to render big characters for the current plane"""
+        cur_plane = self.current_plane
+        try:
+            draw_target = plane_draw_targets[cur_plane]
+        except KeyError:
+            raise ValueError(f"Size {cur_plane} not implemented for rendering")
+        if draw_target:
+            target = getattr(target, draw_target)
+        return target.draw
 
     def refresh(self, clear=True, *, preserve_attrs=False, rect=None, target=None):
         """Render entire text buffer to the owner shape
@@ -530,8 +604,35 @@ class TextPlane:
                 context.background = TRANSPARENT
                 context.effects = TRANSPARENT
 
-            for pos in rect.iter_cells():
-                self.blit(pos, target=target, clear=clear)
+            # Inlined versions of ".blit": only the character and
+            # its position change from one cell to the next.
+            offset_x, offset_y = self._index_offset()
+            if self.current_plane == 1:
+                for y in range(rect.top, rect.bottom):
+                    row = data.row(y, rect.left, rect.right)
+                    if not clear and row.count(EMPTY) == len(row):
+                        # Nothing to render in this row.
+                        continue
+                    for x, char in enumerate(row, rect.left):
+                        if char is EMPTY and not clear:
+                            continue
+                        # context.shape_lastchar_was_double is set in this operation.
+                        target[x + offset_x, y + offset_y] = char
+                        context.text_lastchar_was_double = context.shape_lastchar_was_double
+                return
+
+            context.text_last_char_was_double = False
+            font = context.font or self.font
+            draw = self._big_text_draw(target)
+            for y in range(rect.top, rect.bottom):
+                row = data.row(y, rect.left, rect.right)
+                if not clear and row.count(EMPTY) == len(row):
+                    continue
+                pixel_y = y * 8 + offset_y
+                for x, char in enumerate(row, rect.left):
+                    if char is EMPTY and not clear:
+                        continue
+                    draw.blit((x * 8 + offset_x, pixel_y), render(char, font=font), erase=clear)
 
     def update(self):
         """Re-render any writting on the plane that was done using SpecialMarks
@@ -561,10 +662,9 @@ class TextPlane:
 
         Also, called internally to update StyledSequences that contain animations.
         """
-        if not styled in self.writtings:
-            # We need just the keys and the order
-            # (a dict gives this for free - otherwise we need a set + a sequence)
-            self.writtings[styled] = None
+        # We need just the keys and the order
+        # (a dict gives this for free - otherwise we need a set + a sequence)
+        self.writtings.setdefault(styled, None)
         try:
             self.owner.context.text_rendering_styled = self.current_plane
             styled.render()
@@ -834,6 +834,12 @@ class MLTokenizer(Tokenizer):
         """
         self.expand()
 
+        if "[" not in self.raw_text:
+            # Fast path: no markup, no escaped brackets to handle.
+            self.parsed_text = self.raw_text
+            self._tokens_to_marks(())
+            return
+
         raw_tokens = []
         offset = 0
 
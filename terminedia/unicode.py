@@ -76,6 +76,8 @@ class GraphemeIter:
 
     @lru_cache()
     def __len__(self):
+        if self.text.isascii():
+            return len(self.text)
         return sum(1 for _ in self)
 
     def __iter__(self):
@@ -84,6 +86,19 @@ class GraphemeIter:
         last_char = ""
         self._current_grapheme = -1
 
+        text = self.text
+        if text.isascii():
+            # No combining characters: each character is a grapheme.
+            # (the position attributes are updated just as in the general case bellow)
+            for i in range(1, len(text)):
+                self._current_char = i
+                self._current_grapheme = i - 1
+                yield text[i - 1]
+            if text:
+                self._current_char = self._current_grapheme = len(text) - 1
+                yield text[-1]
+            return
+
         for i, char in enumerate(self.text):
             self._current_char = i
             if not category(char)[0] == 'M' and last_char:
@@ -188,6 +188,48 @@ def text_to_upside_down(text, convert=True):
 _nop_effect = lambda t, c: t
 
 
+_effect_functions = {
+    Effects.encircled: text_to_circled,
+    Effects.squared: text_to_squared,
+    Effects.negative_squared: text_to_negative_squared,
+    Effects.negative_circled: text_to_negative_circled,
+    Effects.parenthesized: text_to_parenthesized,
+    Effects.fullwidth: text_to_fullwidth,
+    Effects.math_bold: text_to_san_serif_bold,
+    Effects.math_bold_italic: text_to_san_serif_bold_italic,
+    Effects.regional_indicator: text_to_regional_indicator_symbol,
+    Effects.super_script: text_to_modifier_letter,
+    Effects.upside_down: text_to_upside_down,
+    Effects.double_struck: text_to_double_struck,
+}
+
+
+def _translate_chars(text, unicode_effects, convert):
+    for effect in unicode_effects:
+        text = _effect_functions.get(effect, _nop_effect)(text, convert)
+    return text
+
+
+class _TranslationTable(dict):
+    """Table for "str.translate" applying a set of effects to ASCII characters.
+
+    Each character is translated on first use.
+    """
+
+    def __init__(self, unicode_effects, convert):
+        self.unicode_effects = unicode_effects
+        self.convert = convert
+
+    def __missing__(self, code):
+        result = self[code] = _translate_chars(chr(code), self.unicode_effects, self.convert)
+        return result
+
+
+@lru_cache(64)
+def _translation_table(unicode_effects, convert):
+    return _TranslationTable(unicode_effects, convert)
+
+
 def translate_chars(text, unicode_effects, convert=True):
     """Apply a sequence of character-translating effects to given text.
       Args:
@@ -196,23 +238,12 @@ def translate_chars(text, unicode_effects, convert=True):
 
 
     """
-    effect_dict = {
-        Effects.encircled: text_to_circled,
-        Effects.squared: text_to_squared,
-        Effects.negative_squared: text_to_negative_squared,
-        Effects.negative_circled: text_to_negative_circled,
-        Effects.parenthesized: text_to_parenthesized,
-        Effects.fullwidth: text_to_fullwidth,
-        Effects.math_bold: text_to_san_serif_bold,
-        Effects.math_bold_italic: text_to_san_serif_bold_italic,
-        Effects.regional_indicator: text_to_regional_indicator_symbol,
-        Effects.super_script: text_to_modifier_letter,
-        Effects.upside_down: text_to_upside_down,
-        Effects.double_struck: text_to_double_struck,
-    }
-    for effect in unicode_effects:
-        text = effect_dict.get(effect, _nop_effect)(text, convert)
-    return text
+    # All effects are applied on a character by character basis -
+    # ASCII text, which needs no normalization, can be translated
+    # using a cached table.
+    if text.isascii() and isinstance(unicode_effects, Effects):
+        return text.translate(_translation_table(unicode_effects, convert))
+    return _translate_chars(text, unicode_effects, convert)
 
 
 
@@ -1,6 +1,7 @@
 import math
 import typing as T
 from collections.abc import Sequence, Iterable
+from functools import lru_cache
 from numbers import Real
 
 from colorsys import rgb_to_hsv, hsv_to_rgb
@@ -25,7 +26,20 @@ css_colors = {
 }
 
 
-_colors_cache = {}
+# Registry of SpecialColor instances, by name
+_special_colors = {}
+
+
+@lru_cache(maxsize=1024)
+def _normalize_components(components):
+    """Cached core of "Color.normalize_color" - components must be a tuple"""
+    if all(0 <= c <= 1.0 for c in components[:3]):
+        color = tuple(int(c * 255) for c in components[:3])
+        if len(components) == 4:
+            color += ((components[3] if isinstance(components[3], int) else int(components[3] * 255)) ,)
+    else:
+        color = components
+    return color
 
 
 class _ComponentDescriptor:
@@ -195,18 +209,7 @@ class Color:
         returns: Color constant, or 3-sequence normalized to 0-255 range.
         """
 
-        components = tuple(components)
-        if isinstance(components, tuple) and components in _colors_cache:
-            return _colors_cache[components]
-
-        if all(0 <= c <= 1.0 for c in components[:3]):
-            color = tuple(int(c * 255) for c in components[:3])
-            if len(components) == 4:
-                color += ((components[3] if isinstance(components[3], int) else int(components[3] * 255)) ,)
-        else:
-            color = components
-        _colors_cache[tuple(components)] = color
-        return color
+        return _normalize_components(tuple(components))
 
     @property
     def normalized(self):
@@ -258,15 +261,15 @@ class SpecialColor(Color):
     __slots__ = ("special", "name", "component_source")
 
     def __new__(cls, value, component_source=None):
-        if value in _colors_cache:
-            return _colors_cache[value]
+        if value in _special_colors:
+            return _special_colors[value]
         return super().__new__(cls)
 
     def __init__(self, value, component_source=None):
         self.special = value
         self.name = value
         self.component_source = component_source
-        _colors_cache[value] = self
+        _special_colors[value] = self
         # no super call.
 
     def __eq__(self, other):
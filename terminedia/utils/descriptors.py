@@ -67,6 +67,9 @@ class ObservableProperty:
         self.registry = WeakKeyDictionary()
         self.next_handler_id = 0
         self.callbacks = {}
+        # Reads are far more frequent than writes: they only need
+        # to look at the registry if any "get" callback was registered
+        self.observes_get = False
         if fget is None:
             self._simple_storage()
             return
@@ -109,7 +112,7 @@ class ObservableProperty:
         if instance is None:
             return self
         value = self.fget(instance)
-        if instance in self.registry or owner in self.registry or self in self.registry:
+        if self.observes_get and (instance in self.registry or owner in self.registry or self in self.registry):
             self.execute(instance, "get", value)
         return value
 
@@ -150,6 +153,8 @@ class ObservableProperty:
             - extra parameters should be passed in "args"
         """
         handler = self.next_handler_id
+        if event == "get":
+            self.observes_get = True
         if instance is None:
             instance = self
         if instance not in self.registry:
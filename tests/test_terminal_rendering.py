@@ -6,7 +6,7 @@ import pytest
 import terminedia as TM
 from terminedia.values import TRANSPARENT, EMPTY
 
-from conftest import rendering_test, fast_and_slow_render_mark
+from conftest import rendering_test, fast_and_slow_render_mark, fast_render_mark
 
 
 def strip_ansi_seqs(text):
@@ -217,3 +217,190 @@ def test_render_transparent_characters_dont_overwrite_terminal_contents():
     # Actual render optimizations won't place a 'move' for each non displayed pixel.
     # assert data.count("[MOVE") == 8
     assert re.sub(r"\[.+?\]", "", data).count(EMPTY) == 0
+
+
+def test_moveto_uses_short_relative_sequences_from_known_position():
+    from terminedia.terminal import ScreenCommands
+
+    stdout = io.StringIO()
+    with mock.patch("sys.stdout", stdout):
+        commands = ScreenCommands()
+        commands.moveto((2, 3))
+        commands.print_at((2, 3), "ab")
+        commands.moveto((7, 3))
+        commands.moveto((7, 1))
+        commands.moveto((1, 1))
+        commands.print_at((1, 1), "一")
+        commands.moveto((3, 1))
+
+    assert stdout.getvalue() == (
+        "\x1b[4;3Hab"
+        "\x1b[3C"
+        "\x1b[2A"
+        "\x1b[2;2H一"
+        # position after a double width character is not trusted:
+        "\x1b[2;4H"
+    )
+
+
+def test_journal_replays_positions_in_row_order():
+    from terminedia.terminal import JournalingScreenCommands
+
+    stdout = io.StringIO()
+    with mock.patch("sys.stdout", stdout):
+        commands = JournalingScreenCommands()
+        with commands:
+            commands.print_at((3, 1), "de")
+            commands.print_at((0, 0), "ab")
+            commands.print_at((1, 1), "c")
+            commands.print_at((0, 0), "X")
+
+    assert stdout.getvalue() == "\x1b[1;1H\x1b[39m\x1b[49mXb\x1b[2;2Hc\x1b[1Cde"
+
+
+@pytest.mark.parametrize(*fast_render_mark)
+@rendering_test
+def test_fast_render_skips_transparent_cells_with_relative_moves():
+
+    sc = TM.Screen(size=(5, 2))
+    sc.data.clear(transparent=True)
+    sc.data[0, 1] = "a"
+    sc.data[3, 1] = "b"
+    sc.update()
+
+    data = ansi_movement_to_markup(strip_ansi_default_colors((yield None)))
+    assert data.endswith("[MOVE TO: 2, 3]a[MOVE RIGHT: 2]b")
+
+
+def test_journal_replay_skips_unchanged_characters():
+    from terminedia.terminal import JournalingScreenCommands
+
+    stdout = io.StringIO()
+    with mock.patch("sys.stdout", stdout):
+        commands = JournalingScreenCommands()
+        with commands:
+            commands.print_at((0, 0), "abc")
+        stdout.seek(0); stdout.truncate()
+        with commands:
+            commands.print_at((0, 0), "abX")
+        assert strip_ansi_seqs(stdout.getvalue()) == "X"
+
+        stdout.seek(0); stdout.truncate()
+        commands.invalidate_shadow()
+        with commands:
+            commands.print_at((0, 0), "abX")
+        assert strip_ansi_seqs(stdout.getvalue()) == "abX"
+
+
+def test_journal_replay_outputs_everything_after_other_terminal_output():
+    from terminedia.terminal import JournalingScreenCommands
+
+    stdout = io.StringIO()
+    with mock.patch("sys.stdout", stdout):
+        commands = JournalingScreenCommands()
+        with commands:
+            commands.print_at((0, 0), "abc")
+        # Creating other commands instances does not change the terminal
+        JournalingScreenCommands()
+        stdout.seek(0); stdout.truncate()
+        with commands:
+            commands.print_at((0, 0), "abc")
+        assert strip_ansi_seqs(stdout.getvalue()) == ""
+
+        TM.cls()
+        TM.print("hello")
+        stdout.seek(0); stdout.truncate()
+        with commands:
+            commands.print_at((0, 0), "abc")
+        assert strip_ansi_seqs(stdout.getvalue()) == "abc"
+
+
+def test_journal_replay_outputs_characters_written_over_double_width_ones():
+    from terminedia.terminal import JournalingScreenCommands
+
+    stdout = io.StringIO()
+    with mock.patch("sys.stdout", stdout):
+        commands = JournalingScreenCommands()
+        commands.invalidate_shadow()
+        with commands:
+            commands.print_at((0, 0), "字b")
+        stdout.seek(0); stdout.truncate()
+        with commands:
+            commands.print_at((0, 0), "ab")
+        assert strip_ansi_seqs(stdout.getvalue()) == "ab"
+
+        stdout.seek(0); stdout.truncate()
+        with commands:
+            commands.print_at((0, 0), "ab")
+        assert strip_ansi_seqs(stdout.getvalue()) == ""
+
+        # Unchanged character next to a new double width one:
+        stdout.seek(0); stdout.truncate()
+        with commands:
+            commands.print_at((0, 0), "字b")
+        assert strip_ansi_seqs(stdout.getvalue()) == "字b"
+
+
+def test_cursor_position_is_not_reused_after_other_terminal_output():
+    from terminedia.terminal import ScreenCommands
+
+    stdout = io.StringIO()
+    with mock.patch("sys.stdout", stdout):
+        commands = ScreenCommands()
+        commands.print_at((2, 3), "a")
+        TM.print("xyz")
+        stdout.seek(0); stdout.truncate()
+        commands.print_at((5, 3), "b")
+        assert stdout.getvalue() == "\x1b[4;6Hb"
+
+
+def test_journal_replay_redraws_cell_covered_by_double_width_character():
+
+    stdout = io.StringIO()
+    fast_render = TM.context.fast_render
+    TM.context.fast_render = False
+    try:
+        with mock.patch("sys.stdout", stdout):
+            sc = TM.Screen(size=(3, 1))
+            # (sc.data is set directly, so that only "update" outputs anything)
+            sc.data[0, 0] = "a"
+            sc.data[1, 0] = "b"
+            sc.update()
+            sc.data[0, 0] = "字"
+            sc.update()
+            stdout.seek(0); stdout.truncate()
+            sc.data[0, 0] = "a"
+            sc.data[1, 0] = "b"
+            sc.update()
+            assert strip_ansi_seqs(stdout.getvalue()).startswith("ab")
+    finally:
+        TM.context.fast_render = fast_render
+
+
+def test_html_screen_can_be_resized():
+    from terminedia.events import Event, EventTypes
+
+    sc = TM.Screen(size=(3, 2), backend="HTML")
+    sc.dynamic_size = True
+    sc._size_change(Event(EventTypes.TerminalSizeChange, size=(4, 3)))
+    assert sc.size == (4, 3)
+
+
+def test_interactive_update_skips_unchanged_characters():
+
+    stdout = io.StringIO()
+    fast_render = TM.context.fast_render
+    interactive_mode = TM.context.interactive_mode
+    TM.context.fast_render = False
+    TM.context.interactive_mode = True
+    try:
+        with mock.patch("sys.stdout", stdout):
+            sc = TM.Screen(size=(3, 1))
+            sc.data[0, 0] = "a"
+            sc.update()
+            stdout.seek(0); stdout.truncate()
+            sc.update()
+            assert strip_ansi_seqs(stdout.getvalue()) == ""
+    finally:
+        TM.context.fast_render = fast_render
+        TM.context.interactive_mode = interactive_mode
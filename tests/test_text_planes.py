@@ -1,6 +1,7 @@
 import terminedia as TM
 
 import pytest
+from unittest import mock
 
 @pytest.mark.parametrize(
     ("number_name", "text_name"),[
@@ -28,3 +29,74 @@ def test_text_plane_clear():
     assert isinstance(sh.text[1].marks[10,0], TM.Mark)
     assert sh.text[1].plane[1, 0] == " "
     assert sh.text[1].marks.get((1, 0), None) is None
+
+
+def test_text_plane_data_keeps_contents_on_resize():
+    sh = TM.shape((10, 4))
+    sh.text[1][0, 1] = "klm"
+    sh.text[1].padding = 1
+    assert sh.text[1].plane.size == (8, 2)
+    assert sh.text[1].plane[2, 1] == "m"
+    with pytest.raises(IndexError):
+        sh.text[1].plane[8, 0]
+
+
+def test_text_plane_data_row():
+    sh = TM.shape((10, 4))
+    sh.text[1][2, 1] = "klm"
+    assert sh.text[1].plane.row(1) == list("  klm     ")
+    assert sh.text[1].plane.row(1, 3, 5) == ["l", "m"]
+    with pytest.raises(IndexError):
+        sh.text[1].plane.row(1, 5, 11)
+
+
+def test_text_plane_padding_change_moves_new_text():
+    sh = TM.shape((10, 4))
+    sh.text[1][0, 0] = "a"
+    assert sh[0, 0].value == "a"
+    sh.text[1].padding = 1
+    sh.text[1][0, 0] = "b"
+    assert sh[1, 1].value == "b"
+    sh.text[1].pad_left = 2
+    sh.text[1][0, 0] = "c"
+    assert sh[2, 1].value == "c"
+
+
+def test_text_root_padding_propagates_to_existing_planes():
+    sh = TM.shape((10, 4))
+    sh.text[1][0, 0] = "a"
+    sh.text.padding = 1
+    assert sh.text[1].padding == 1
+    assert sh.text[1].plane.size == (8, 2)
+    sh.text[1][0, 0] = "b"
+    assert sh[1, 1].value == "b"
+
+
+def test_text_same_markup_renders_the_same_each_time():
+    sh = TM.shape((10, 4))
+    text = "[color: red]a[/color]b[direction: down]cd"
+    sh.text[1][0, 0] = text
+    sh.text[1][5, 0] = text
+    for x in (0, 5):
+        assert sh[x, 0].foreground == TM.Color("red")
+        assert sh[x + 1, 0].foreground != TM.Color("red")
+        assert sh[x + 2, 0].value == "c"
+        assert sh[x + 2, 1].value == "d"
+
+
+def test_text_same_markup_renderings_do_not_share_marks():
+    sh = TM.shape((10, 4))
+    text = "[color: red]a[/color]b"
+    styled = []
+    original_styled_sequence = TM.text.style.StyledSequence
+    def record(*args, **kwargs):
+        styled.append(original_styled_sequence(*args, **kwargs))
+        return styled[-1]
+    with mock.patch.object(TM.text.style, "StyledSequence", record):
+        sh.text[1][0, 0] = text
+        sh.text[1][3, 2] = text
+    first, second = (sequence.mark_sequence for sequence in styled)
+    for index in first:
+        assert first[index] is not second[index]
+    assert first[0].pos == (0, 0)
+    assert second[0].pos == (3, 2)